@@ -1,5 +1,6 @@
 """Base class for all Slack components"""
 
+import threading
 from abc import ABC, abstractmethod
 from slack_bolt import App  # pylint: disable=import-error
 from solace_ai_connector.components.component_base import ComponentBase
@@ -7,6 +8,7 @@ from solace_ai_connector.components.component_base import ComponentBase
 
 class SlackBase(ComponentBase, ABC):
     _slack_apps = {}
+    _slack_apps_lock = threading.Lock()
 
     def __init__(self, module_info, **kwargs):
         super().__init__(module_info, **kwargs)
@@ -16,12 +18,24 @@ class SlackBase(ComponentBase, ABC):
         self.max_total_file_size = self.get_config("max_total_file_size", 20)
         self.share_slack_connection = self.get_config("share_slack_connection")
 
+        # validate_config() only checks that the token is present, not that it
+        # has a value
+        if not self.slack_bot_token:
+            raise ValueError(
+                f"Configuration error in component '{self.name}': "
+                "Configuration parameter 'slack_bot_token' must not be empty."
+            )
+
         if self.share_slack_connection:
-            if self.slack_bot_token not in SlackBase._slack_apps:
-                self.app = App(token=self.slack_bot_token)
-                SlackBase._slack_apps[self.slack_bot_token] = self.app
-            else:
-                self.app = SlackBase._slack_apps[self.slack_bot_token]
+            self.app = SlackBase._slack_apps.get(self.slack_bot_token)
+            if self.app is None:
+                # Components may start in parallel - make sure only one App is
+                # created per token
+                with SlackBase._slack_apps_lock:
+                    self.app = SlackBase._slack_apps.get(self.slack_bot_token)
+                    if self.app is None:
+                        self.app = App(token=self.slack_bot_token)
+                        SlackBase._slack_apps[self.slack_bot_token] = self.app
         else:
             self.app = App(token=self.slack_bot_token)
 
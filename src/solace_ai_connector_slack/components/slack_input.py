@@ -1,7 +1,12 @@
 import threading
 import queue
 import base64
+import re
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 
 from slack_bolt.adapter.socket_mode import SocketModeHandler
@@ -9,6 +14,24 @@ from solace_ai_connector.common.message import Message
 from solace_ai_connector.common.log import log
 from .slack_base import SlackBase
 
+# Matches <@U123ABC> and <@!U123ABC> user mentions in message text
+MENTION_RE = re.compile(r"<@!?(U[A-Z0-9]+)>")
+
+# Upper bound on concurrent attachment downloads for a single message
+MAX_PARALLEL_DOWNLOADS = 4
+
+# Number of worker threads the socket mode client runs listeners on
+SOCKET_MODE_WORKERS = 10
+
+# How long (in seconds) looked up user profiles and channel names are reused
+LOOKUP_CACHE_TTL = 600
+
+# Maximum number of user profiles and channel names each kept in the cache
+LOOKUP_CACHE_MAX_SIZE = 1024
+
+# The only profile fields used from a users_info lookup
+USER_PROFILE_FIELDS = ("email", "real_name_normalized")
+
 
 info = {
     "class_name": "SlackInput",
@@ -21,6 +44,7 @@ info = {
             "name": "slack_bot_token",
             "type": "string",
             "description": "The Slack bot token to connect to Slack.",
+            "required": True,
         },
         {
             "name": "slack_app_token",
@@ -161,11 +185,12 @@ class SlackInput(SlackBase):
             slack_bot_token=self.slack_bot_token,
             input_queue=self.slack_receiver_queue,
             stop_event=self.stop_receiver_event,
-            max_file_size=self.get_config("max_file_size"),
-            max_total_file_size=self.get_config("max_total_file_size"),
+            max_file_size=self.max_file_size,
+            max_total_file_size=self.max_total_file_size,
             listen_to_channels=self.get_config("listen_to_channels"),
             send_history_on_join=self.get_config("send_history_on_join"),
             acknowledgement_message=self.get_config("acknowledgement_message"),
+            share_slack_connection=self.share_slack_connection,
         )
         self.slack_receiver.start()
 
@@ -198,6 +223,7 @@ class SlackReceiver(threading.Thread):
         listen_to_channels=False,
         send_history_on_join=False,
         acknowledgement_message=None,
+        share_slack_connection=False,
     ):
         threading.Thread.__init__(self)
         self.app = app
@@ -210,11 +236,40 @@ class SlackReceiver(threading.Thread):
         self.listen_to_channels = listen_to_channels
         self.send_history_on_join = send_history_on_join
         self.acknowledgement_message = acknowledgement_message
+        self.share_slack_connection = share_slack_connection
+        self.channel_type_handlers = {
+            "im": self.handle_event,
+            "channel": self.handle_channel_event,
+            "group": self.handle_group_event,
+        }
+        self.team_domains = {}
+        # Both map an id to a (value, expiry time) tuple, oldest first
+        self.channel_names = OrderedDict()
+        self.user_profiles = OrderedDict()
+        self.lookup_cache_lock = threading.Lock()
+        # Reuse connections to files.slack.com across attachment downloads.
+        # The session is shared by the listener threads and the per-message
+        # download pools. That is safe here: it only issues GETs with a fixed
+        # header, never stores cookies or changes its own state after setup,
+        # and urllib3's connection pool is thread-safe. The pool is sized so
+        # concurrent downloads do not discard connections.
+        self.http_session = requests.Session()
+        self.http_session.headers["Authorization"] = "Bearer " + slack_bot_token
+        self.http_session.mount(
+            "https://",
+            HTTPAdapter(pool_maxsize=MAX_PARALLEL_DOWNLOADS * SOCKET_MODE_WORKERS),
+        )
         self.register_handlers()
 
     def run(self):
-        SocketModeHandler(self.app, self.slack_app_token).connect()
+        SocketModeHandler(
+            self.app, self.slack_app_token, concurrency=SOCKET_MODE_WORKERS
+        ).connect()
         self.stop_event.wait()
+        # Listeners on a shared app outlive this receiver and may still be
+        # downloading through the session, so only close it when not shared
+        if not self.share_slack_connection:
+            self.http_session.close()
 
     def handle_channel_event(self, event):
         # For now, just do the normal handling
@@ -227,128 +282,216 @@ class SlackReceiver(threading.Thread):
         log.info("Received a private group event. Ignoring.")
 
     def handle_event(self, event):
-        files = []
-        total_file_size = 0
-        if "files" in event:
-            for file in event["files"]:
-                file_url = file["url_private"]
-                file_name = file["name"]
-                size = file["size"]
-                total_file_size += size
-                if size > self.max_file_size * 1024 * 1024:
-                    log.warning(
-                        "File %s is too large to download. Skipping download.",
-                        file_name,
-                    )
-                    continue
-                if total_file_size > self.max_total_file_size * 1024 * 1024:
-                    log.warning(
-                        "Total file size exceeds the maximum limit. Skipping download."
-                    )
-                    break
-                b64_file = self.download_file_as_base64_string(file_url)
-                files.append(
-                    {
-                        "name": file_name,
-                        "content": b64_file,
-                        "mime_type": file["mimetype"],
-                        "filetype": file["filetype"],
-                        "size": size,
-                    }
-                )
+        user_id = event["user"]
+        channel = event.get("channel")
+        thread_ts = event.get("thread_ts")
+        team_id = event.get("team")
+
+        # Acknowledge first so the user sees a response while the files are
+        # downloaded and the message is prepared
+        ack_msg_ts = None
+        if self.acknowledgement_message:
+            ack_msg_ts = self.app.client.chat_postMessage(
+                channel=channel,
+                text=self.acknowledgement_message,
+                thread_ts=thread_ts,
+            ).get("ts")
 
-        team_domain = None
         try:
-            permalink = self.app.client.chat_getPermalink(
-                channel=event["channel"], message_ts=event["event_ts"]
-            )
-            team_domain = permalink.get("permalink", "").split("//")[1]
-            team_domain = team_domain.split(".")[0]
-        except Exception as e:
-            log.error("Error getting team domain: %s", e)
+            files = self.download_files(event.get("files", []))
+
+            team_domain = self.get_team_domain(event)
+
+            user_email = self.get_user_email(user_id)
+            (text, mention_emails) = self.process_text_for_mentions(event["text"])
+        except Exception:
+            # No message will reach the output to replace the acknowledgement,
+            # so remove it rather than leave it in the thread forever
+            self.delete_acknowledgement(channel, ack_msg_ts)
+            raise
 
-        user_email = self.get_user_email(event["user"])
-        (text, mention_emails) = self.process_text_for_mentions(event["text"])
-        payload = {
-            "text": text,
-            "files": files,
-            "user_email": user_email,
-            "team_id": event.get("team"),
-            "team_domain": team_domain,
-            "mentions": mention_emails,
-            "type": event.get("type"),
-            "client_msg_id": event.get("client_msg_id"),
-            "ts": event.get("thread_ts"),
-            "channel": event.get("channel"),
-            "channel_name": event.get("channel_name", ""),
-            "subtype": event.get("subtype"),
-            "event_ts": event.get("event_ts"),
-            "channel_type": event.get("channel_type"),
-            "user_id": event.get("user"),
-        }
         user_properties = {
             "user_email": user_email,
-            "team_id": event.get("team"),
+            "team_id": team_id,
             "type": event.get("type"),
             "client_msg_id": event.get("client_msg_id"),
-            "ts": event.get("thread_ts"),
-            "channel": event.get("channel"),
+            "ts": thread_ts,
+            "channel": channel,
             "subtype": event.get("subtype"),
             "event_ts": event.get("event_ts"),
             "channel_type": event.get("channel_type"),
-            "user_id": event.get("user"),
+            "user_id": user_id,
+            "ack_msg_ts": ack_msg_ts,
+        }
+        # The payload carries all of the user properties plus the message content
+        payload = {
+            **user_properties,
+            "text": text,
+            "files": files,
+            "team_domain": team_domain,
+            "mentions": mention_emails,
+            "channel_name": event.get("channel_name", ""),
         }
-
-        if self.acknowledgement_message:
-            ack_msg_ts = self.app.client.chat_postMessage(
-                channel=event["channel"],
-                text=self.acknowledgement_message,
-                thread_ts=event.get("thread_ts"),
-            ).get("ts")
-            user_properties["ack_msg_ts"] = ack_msg_ts
 
         message = Message(payload=payload, user_properties=user_properties)
         message.set_previous(payload)
         self.input_queue.put(message)
 
+    def delete_acknowledgement(self, channel, ack_msg_ts):
+        if not ack_msg_ts:
+            return
+        try:
+            self.app.client.chat_delete(channel=channel, ts=ack_msg_ts)
+        except Exception as e:
+            log.error("Error deleting acknowledgement message: %s", e)
+
+    def get_team_domain(self, event):
+        # The domain never changes for a team, so only ask Slack once per team
+        team_id = event.get("team")
+        if team_id in self.team_domains:
+            return self.team_domains[team_id]
+
+        team_domain = None
+        try:
+            permalink = self.app.client.chat_getPermalink(
+                channel=event["channel"], message_ts=event["event_ts"]
+            )
+            team_domain = permalink.get("permalink", "").split("//")[1]
+            team_domain = team_domain.split(".")[0]
+        except Exception as e:
+            log.error("Error getting team domain: %s", e)
+
+        if team_id and team_domain:
+            self.team_domains[team_id] = team_domain
+        return team_domain
+
+    def download_files(self, event_files):
+        to_download = []
+        total_file_size = 0
+        for file in event_files:
+            file_name = file["name"]
+            size = file["size"]
+            total_file_size += size
+            if size > self.max_file_size * 1024 * 1024:
+                log.warning(
+                    "File %s is too large to download. Skipping download.",
+                    file_name,
+                )
+                continue
+            if total_file_size > self.max_total_file_size * 1024 * 1024:
+                log.warning(
+                    "Total file size exceeds the maximum limit. Skipping download."
+                )
+                break
+            to_download.append(file)
+
+        if not to_download:
+            return []
+
+        file_urls = [file["url_private"] for file in to_download]
+        if len(file_urls) == 1:
+            contents = [self.download_file_as_base64_string(file_urls[0])]
+        else:
+            # Fetch multiple attachments in parallel rather than one after another
+            with ThreadPoolExecutor(
+                max_workers=min(len(file_urls), MAX_PARALLEL_DOWNLOADS)
+            ) as executor:
+                contents = list(
+                    executor.map(self.download_file_as_base64_string, file_urls)
+                )
+
+        return [
+            {
+                "name": file["name"],
+                "content": b64_file,
+                "mime_type": file["mimetype"],
+                "filetype": file["filetype"],
+                "size": file["size"],
+            }
+            for file, b64_file in zip(to_download, contents)
+        ]
+
     def download_file_as_base64_string(self, file_url):
-        headers = {"Authorization": "Bearer " + self.slack_bot_token}
-        response = requests.get(file_url, headers=headers, timeout=10)
+        response = self.http_session.get(file_url, timeout=10)
         base64_string = base64.b64encode(response.content).decode("utf-8")
         return base64_string
 
     def get_user_email(self, user_id):
+        profile = self.get_user_profile(user_id) or {}
+        return profile.get("email", user_id)
+
+    def get_user_profile(self, user_id):
+        return self.get_cached(self.user_profiles, user_id, self.fetch_user_profile)
+
+    def fetch_user_profile(self, user_id):
         response = self.app.client.users_info(user=user_id)
-        return response["user"]["profile"].get("email", user_id)
+        profile = response.get("user", {}).get("profile")
+        if profile is None:
+            return None
+        return {key: profile[key] for key in USER_PROFILE_FIELDS if key in profile}
 
     def process_text_for_mentions(self, text):
         mention_emails = []
-        for mention in text.split("<@"):
-            if mention.startswith("!"):
-                mention = mention[1:]
-            if mention.startswith("U"):
-                user_id = mention.split(">")[0]
-                response = self.app.client.users_info(user=user_id)
-                profile = response.get("user", {}).get("profile")
+        # Most messages have no mentions at all - skip the scan for them
+        if "<@" not in text:
+            return text, mention_emails
+        # Only the lookup is shared between repeated mentions of a user - each
+        # occurrence still gets its own entry in mention_emails
+        replacements = {}
+
+        def replace_mention(match):
+            user_id = match.group(1)
+            if user_id not in replacements:
+                replacement = None
+                profile = self.get_user_profile(user_id)
                 if profile:
                     replacement = profile.get(
                         "email", "<@" + profile.get("real_name_normalized") + ">"
                     )
-                    mention_emails.append(replacement)
-                    text = text.replace(
-                        f"<@{user_id}>",
-                        replacement,
-                    )
+                replacements[user_id] = replacement
+            if replacements[user_id] is None:
+                return match.group(0)
+            mention_emails.append(replacements[user_id])
+            return replacements[user_id]
+
+        text = MENTION_RE.sub(replace_mention, text)
         return text, mention_emails
 
     def get_channel_name(self, channel_id):
+        return self.get_cached(
+            self.channel_names, channel_id, self.fetch_channel_name
+        )
+
+    def fetch_channel_name(self, channel_id):
         response = self.app.client.conversations_info(channel=channel_id)
         return response["channel"].get("name")
 
+    def get_cached(self, cache, key, fetch):
+        # Listeners run on Bolt's worker threads, so guard the cache. The
+        # Slack call itself is made outside the lock.
+        now = time.monotonic()
+        with self.lookup_cache_lock:
+            entry = cache.get(key)
+            if entry:
+                if entry[1] > now:
+                    return entry[0]
+                del cache[key]
+
+        value = fetch(key)
+
+        with self.lookup_cache_lock:
+            cache[key] = (value, now + LOOKUP_CACHE_TTL)
+            cache.move_to_end(key)
+            while len(cache) > LOOKUP_CACHE_MAX_SIZE:
+                cache.popitem(last=False)
+        return value
+
     def get_channel_history(self, channel_id, team_id):
         response = self.app.client.conversations_history(channel=channel_id)
 
-        # First search through messages to get all their replies
+        # First search through messages to get all their replies. The replies
+        # include the parent message itself, so skip any ts we already have
+        seen_ts = {message.get("ts") for message in response["messages"]}
         messages_to_add = []
         for message in response["messages"]:
             if "subtype" not in message and "text" in message:
@@ -357,7 +500,10 @@ class SlackReceiver(threading.Thread):
                     replies = self.app.client.conversations_replies(
                         channel=channel_id, ts=message.get("ts")
                     )
-                    messages_to_add.extend(replies["messages"])
+                    for reply in replies["messages"]:
+                        if reply.get("ts") not in seen_ts:
+                            seen_ts.add(reply.get("ts"))
+                            messages_to_add.append(reply)
 
         response["messages"].extend(messages_to_add)
 
@@ -420,17 +566,14 @@ class SlackReceiver(threading.Thread):
     def register_handlers(self):
         @self.app.event("message")
         def handle_chat_message(event):
-            print("Got message event: ", event, event.get("channel_type"))
-            if event.get("channel_type") == "im":
-                self.handle_event(event)
-            elif event.get("channel_type") == "channel":
-                self.handle_channel_event(event)
-            elif event.get("channel_type") == "group":
-                self.handle_group_event(event)
+            log.debug("Got message event: %s %s", event, event.get("channel_type"))
+            handler = self.channel_type_handlers.get(event.get("channel_type"))
+            if handler:
+                handler(event)
 
         @self.app.event("app_mention")
         def handle_app_mention(event):
-            print("Got app_mention event: ", event)
+            log.debug("Got app_mention event: %s", event)
             event["channel_type"] = "im"
             event["channel_name"] = self.get_channel_name(event.get("channel"))
             self.handle_event(event)
@@ -1,10 +1,19 @@
-import base64
+import binascii
 import re
+from collections import OrderedDict
 
 
 from solace_ai_connector.common.log import log
 from .slack_base import SlackBase
 
+# Patterns used to convert common LLM markdown into Slack mrkdwn
+LINK_RE = re.compile(r"\[(.*?)\]\((http.*?)\)")
+CODE_BLOCK_LANGUAGE_RE = re.compile(r"```[a-z]+\n")
+BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+
+# Maximum number of in-progress streamed responses to remember
+MAX_STREAMED_MESSAGES = 1000
+
 
 info = {
     "class_name": "SlackOutput",
@@ -16,6 +25,7 @@ info = {
             "name": "slack_bot_token",
             "type": "string",
             "description": "The Slack bot token to connect to Slack.",
+            "required": True,
         },
         {
             "name": "slack_app_token",
@@ -89,6 +99,10 @@ info = {
                                 },
                                 "content": {
                                     "type": "string",
+                                    "description": (
+                                        "The file content, either as a base64 "
+                                        "encoded string or as raw bytes."
+                                    ),
                                 },
                                 "mime_type": {
                                     "type": "string",
@@ -114,6 +128,8 @@ class SlackOutput(SlackBase):
     def __init__(self, **kwargs):
         super().__init__(info, **kwargs)
         self.fix_formatting = self.get_config("correct_markdown_formatting", True)
+        # Last text written to each acknowledgement message while streaming
+        self.last_streamed_text = OrderedDict()
 
     def invoke(self, message, data):
         message_info = data.get("message_info")
@@ -135,12 +151,13 @@ class SlackOutput(SlackBase):
 
     def send_message(self, message):
         try:
-            channel = message.get_data("previous:channel")
-            messages = message.get_data("previous:text")
-            stream = message.get_data("previous:stream")
-            files = message.get_data("previous:files") or []
-            thread_ts = message.get_data("previous:ts")
-            ack_msg_ts = message.get_data("previous:ack_msg_ts")
+            previous = message.get_data("previous") or {}
+            channel = previous.get("channel")
+            messages = previous.get("text")
+            stream = previous.get("stream")
+            files = previous.get("files") or []
+            thread_ts = previous.get("thread_ts")
+            ack_msg_ts = previous.get("ack_msg_ts")
 
             if not isinstance(messages, list):
                 if messages is not None:
@@ -148,15 +165,23 @@ class SlackOutput(SlackBase):
                 else:
                     messages = []
 
+            if stream:
+                # Each streaming update overwrites the acknowledgement message,
+                # so only the newest text in the batch will ever be seen
+                messages = messages[-1:]
+
             for text in messages:
                 if self.fix_formatting:
                     text = self.fix_markdown(text)
                 if stream:
                     if ack_msg_ts:
+                        if self.last_streamed_text.get(ack_msg_ts) == text:
+                            continue
                         try:
                             self.app.client.chat_update(
                                 channel=channel, ts=ack_msg_ts, text=text
                             )
+                            self.remember_streamed_text(ack_msg_ts, text)
                         except Exception:
                             # It is normal to possibly get an update after the final
                             # message has already arrived and deleted the ack message
@@ -166,13 +191,19 @@ class SlackOutput(SlackBase):
                         channel=channel, text=text, thread_ts=thread_ts
                     )
 
-            for file in files:
-                file_content = base64.b64decode(file["content"])
+            if files:
+                # Upload all files together so they are shared in a single
+                # completion call rather than one request per file
                 self.app.client.files_upload_v2(
                     channel=channel,
-                    file=file_content,
                     thread_ts=thread_ts,
-                    filename=file["name"],
+                    file_uploads=[
+                        {
+                            "file": self.get_file_content(file),
+                            "filename": file["name"],
+                        }
+                        for file in files
+                    ],
                 )
         except Exception as e:
             log.error("Error sending slack message: %s", e)
@@ -181,16 +212,38 @@ class SlackOutput(SlackBase):
 
         try:
             if ack_msg_ts and not stream:
+                self.last_streamed_text.pop(ack_msg_ts, None)
                 self.app.client.chat_delete(channel=channel, ts=ack_msg_ts)
         except Exception:
             pass
 
+    def remember_streamed_text(self, ack_msg_ts, text):
+        # Streams that never send a final message would otherwise leave their
+        # entry behind forever, so evict the least recently updated ones
+        self.last_streamed_text[ack_msg_ts] = text
+        self.last_streamed_text.move_to_end(ack_msg_ts)
+        while len(self.last_streamed_text) > MAX_STREAMED_MESSAGES:
+            self.last_streamed_text.popitem(last=False)
+
+    def get_file_content(self, file):
+        # Files produced in-process may already carry raw bytes - only
+        # base64 content needs to be decoded
+        content = file["content"]
+        if isinstance(content, bytes):
+            return content
+        return binascii.a2b_base64(content)
+
     def fix_markdown(self, message):
-        # Fix links - the LLM is very stubborn about giving markdown links
-        # Find [text](http...) and replace with <http...|text>
-        message = re.sub(r"\[(.*?)\]\((http.*?)\)", r"<\2|\1>", message)
-        # Remove the language specifier from code blocks
-        message = re.sub(r"```[a-z]+\n", "```", message)
-        # Fix bold
-        message = re.sub(r"\*\*(.*?)\*\*", r"*\1*", message)
+        # Most messages (and streaming chunks) contain nothing to fix, so only
+        # run each pattern when its marker is present
+        if "[" in message:
+            # Fix links - the LLM is very stubborn about giving markdown links
+            # Find [text](http...) and replace with <http...|text>
+            message = LINK_RE.sub(r"<\2|\1>", message)
+        if "```" in message:
+            # Remove the language specifier from code blocks
+            message = CODE_BLOCK_LANGUAGE_RE.sub("```", message)
+        if "**" in message:
+            # Fix bold
+            message = BOLD_RE.sub(r"*\1*", message)
         return message
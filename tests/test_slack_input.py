@@ -0,0 +1,117 @@
+import queue
+import threading
+from unittest.mock import MagicMock
+
+from solace_ai_connector_slack.components.slack_input import SlackReceiver
+
+
+PROFILES = {
+    "U111": {"email": "alice@example.com", "real_name_normalized": "Alice"},
+    "U222": {"email": "bob@example.com", "real_name_normalized": "Bob"},
+    "U333": {"real_name_normalized": "Carol"},
+}
+
+
+def users_info(user):
+    if user not in PROFILES:
+        return {}
+    return {"user": {"profile": PROFILES[user]}}
+
+
+def make_receiver(**kwargs):
+    app = MagicMock()
+    app.client.users_info.side_effect = users_info
+    return SlackReceiver(
+        app=app,
+        slack_app_token="xapp-test",
+        slack_bot_token="xoxb-test",
+        input_queue=queue.Queue(),
+        stop_event=threading.Event(),
+        **kwargs,
+    )
+
+
+def test_mentions_text_without_mentions_is_untouched():
+    receiver = make_receiver()
+    assert receiver.process_text_for_mentions("no mentions here") == (
+        "no mentions here",
+        [],
+    )
+    receiver.app.client.users_info.assert_not_called()
+
+
+def test_mentions_are_replaced_with_emails():
+    receiver = make_receiver()
+    text, mentions = receiver.process_text_for_mentions("hi <@U111> and <@U222>")
+    assert text == "hi alice@example.com and bob@example.com"
+    assert mentions == ["alice@example.com", "bob@example.com"]
+
+
+def test_mentions_repeated_user_is_listed_per_mention_and_looked_up_once():
+    receiver = make_receiver()
+    text, mentions = receiver.process_text_for_mentions("<@U111> ping <@U111>")
+    assert text == "alice@example.com ping alice@example.com"
+    assert mentions == ["alice@example.com", "alice@example.com"]
+    assert receiver.app.client.users_info.call_count == 1
+
+
+def test_mentions_bang_form_is_replaced():
+    receiver = make_receiver()
+    text, mentions = receiver.process_text_for_mentions("hey <@!U222>")
+    assert text == "hey bob@example.com"
+    assert mentions == ["bob@example.com"]
+
+
+def test_mentions_without_email_use_the_real_name():
+    receiver = make_receiver()
+    text, mentions = receiver.process_text_for_mentions("cc <@U333>")
+    assert text == "cc <@Carol>"
+    assert mentions == ["<@Carol>"]
+
+
+def test_mentions_unknown_user_is_left_in_place():
+    receiver = make_receiver()
+    text, mentions = receiver.process_text_for_mentions("ask <@U999>")
+    assert text == "ask <@U999>"
+    assert mentions == []
+
+
+MB = 1024 * 1024
+
+
+def slack_file(name, size):
+    return {
+        "name": name,
+        "size": size,
+        "url_private": f"https://files.slack.com/{name}",
+        "mimetype": "text/plain",
+        "filetype": "text",
+    }
+
+
+def download_names(receiver, files):
+    receiver.download_file_as_base64_string = lambda url: url.rsplit("/", 1)[-1]
+    return [file["content"] for file in receiver.download_files(files)]
+
+
+def test_download_skips_files_over_the_per_file_limit():
+    receiver = make_receiver(max_file_size=1, max_total_file_size=10)
+    files = [slack_file("big", 2 * MB), slack_file("small", MB // 2)]
+    assert download_names(receiver, files) == ["small"]
+
+
+def test_download_stops_at_the_total_limit():
+    receiver = make_receiver(max_file_size=5, max_total_file_size=5)
+    files = [
+        slack_file("one", 2 * MB),
+        slack_file("two", 2 * MB),
+        slack_file("three", 2 * MB),
+        slack_file("four", MB // 2),
+    ]
+    assert download_names(receiver, files) == ["one", "two"]
+
+
+def test_download_skipped_files_still_count_towards_the_total():
+    receiver = make_receiver(max_file_size=1, max_total_file_size=3)
+    files = [slack_file("big", 3 * MB), slack_file("small", MB // 2)]
+    assert download_names(receiver, files) == []
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from solace_ai_connector.common.message import Message
+from solace_ai_connector.components.component_base import ComponentBase
+from solace_ai_connector_slack.components.slack_output import SlackOutput
+
+
+def make_output(**component_config):
+    # Swap in a mock Bolt App so the real constructor never contacts Slack
+    with patch("solace_ai_connector_slack.components.slack_base.App"):
+        return SlackOutput(
+            config={
+                "component_name": "slack_output",
+                "component_config": {
+                    "slack_bot_token": "xoxb-test",
+                    **component_config,
+                },
+            }
+        )
+
+
+def send(output, data):
+    message = Message(payload={})
+    message.set_previous(output.invoke(message, data))
+    with patch.object(ComponentBase, "send_message"):
+        output.send_message(message)
+
+
+def test_reply_and_files_go_to_the_thread():
+    output = make_output()
+    send(
+        output,
+        {
+            "message_info": {"channel": "C1", "ts": "1700000000.000100"},
+            "content": {
+                "text": "hello",
+                "files": [{"name": "a.txt", "content": "aGVsbG8="}],
+            },
+        },
+    )
+
+    output.app.client.chat_postMessage.assert_called_once_with(
+        channel="C1", text="hello", thread_ts="1700000000.000100"
+    )
+    upload = output.app.client.files_upload_v2.call_args.kwargs
+    assert upload["channel"] == "C1"
+    assert upload["thread_ts"] == "1700000000.000100"
+    assert upload["file_uploads"] == [{"file": b"hello", "filename": "a.txt"}]
+
+
+def test_bytes_file_content_is_uploaded_unchanged():
+    output = make_output()
+    content = b"\x89PNG\r\n\x1a\n"
+    send(
+        output,
+        {
+            "message_info": {"channel": "C1", "ts": "1700000000.000100"},
+            "content": {"files": [{"name": "a.png", "content": content}]},
+        },
+    )
+
+    upload = output.app.client.files_upload_v2.call_args.kwargs
+    assert upload["file_uploads"] == [{"file": content, "filename": "a.png"}]
+    assert upload["file_uploads"][0]["file"] is content
+
+
+def test_fix_markdown_converts_links_code_blocks_and_bold():
+    output = make_output()
+    message = "See [the docs](https://example.com) for **details**\n```python\nx = 1\n```"
+    assert output.fix_markdown(message) == (
+        "See <https://example.com|the docs> for *details*\n```x = 1\n```"
+    )
+
+
+def test_fix_markdown_skips_patterns_without_their_marker():
+    output = make_output()
+    module = "solace_ai_connector_slack.components.slack_output"
+    with patch(f"{module}.LINK_RE") as link_re, patch(
+        f"{module}.CODE_BLOCK_LANGUAGE_RE"
+    ) as code_re, patch(f"{module}.BOLD_RE") as bold_re:
+        assert output.fix_markdown("plain *slack* text") == "plain *slack* text"
+    link_re.sub.assert_not_called()
+    code_re.sub.assert_not_called()
+    bold_re.sub.assert_not_called()